@@ -11,12 +11,14 @@ Resilience improvements:
   before falling back to CSS selectors.
 - Variant-aware regex option remains available (price_regex).
 
-CONFIG OVERVIEW (config.yaml):
+CONFIG OVERVIEW (config.yaml, or the same keys in a .json file):
 - default_drop_percent: 10
+- http: { headers?, max_workers?, cache? }  # max_workers = concurrent fetches (default 16)
+    cache: { expire_after: 1800, path: ".pt_http_cache" }  # needs requests-cache
 - msrp: 2747.00     # use for used-market percent comparisons (optional)
 - smtp: {...}       # email credentials
 - products:         # exact retailer pages (track percent drop vs. baseline per product)
-    - { id, name, url, price_regex?, selector?, attr?, drop_percent?, baseline? }
+    - { id, name, url, price_regex?, selector?, attr?, drop_percent?, baseline?, http_cache? }
 - searches:         # used marketplace/search pages
     - {
         id, name, url,
@@ -25,41 +27,102 @@ CONFIG OVERVIEW (config.yaml):
         alert_below: 2300,      # optional absolute ceiling
         alert_percent_below_msrp: 10, # or % below msrp (if msrp present)
         site: "ebay" | "craigslist" | "generic",  # optional hints
+        parser: "lxml" | "lexbor",  # optional; "lexbor" needs selectolax
       }
 
 STATE:
 - prices_state.json stores baselines, history, and "seen" listing URLs for searches to avoid repeats.
+- It also keeps each page's ETag/Last-Modified so unchanged pages come back as a bodiless 304,
+  plus a hash of the entry's config so edited settings force a full refetch.
 """
-import os, re, json, time, ssl, smtplib, logging, math
-from typing import Optional, Dict, Any, List, Tuple
-from email.mime.text import MIMEText
+import os, re, json, time, ssl, smtplib, logging, math, threading, hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List, Tuple, Union
+from urllib.parse import urljoin
+from email.message import EmailMessage
 
 import requests, yaml
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 from lxml import html, etree
+from lxml.cssselect import CSSSelector
+
+try:
+    import orjson  # optional: faster JSON-LD decoding and state I/O
+except ImportError:
+    orjson = None
+try:
+    import requests_cache  # optional: on-disk HTTP cache (http.cache)
+except ImportError:
+    requests_cache = None
+try:
+    from selectolax.lexbor import LexborHTMLParser  # optional: searches with parser: "lexbor"
+except ImportError:
+    LexborHTMLParser = None
+try:
+    from yaml import CSafeLoader as YamlLoader  # libyaml-backed
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
 
 STATE_FILE = os.environ.get("PT_STATE_FILE", "prices_state.json")
+MAX_WORKERS = 16  # concurrent page fetches; the run is network-bound
+NOT_MODIFIED = object()  # returned by fetch_text/fetch_doc on HTTP 304
+VALIDATOR_KEYS = ("etag", "last_modified")
+SEEN_LIMIT = 2000  # most recent listing URLs remembered per search
+
+# Patterns used per page / per card, compiled once.
+_NUM_CLEAN_RE = re.compile(r"[^\d.,]")
+_NUM_EXTRACT_RE = re.compile(r"\d+(?:\.\d+)?")
+_JSONLD_SCRIPT_RE = re.compile(r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.S | re.I)
+_PRICE_KEY_RE = re.compile(r'"(?:price|lowPrice|highPrice)"\s*:\s*"?([0-9][0-9\.,]*)"?')
+_OG_RE = re.compile(r'property=["\']product:price:amount["\'][^>]*content=["\']([^"\']+)["\']', re.I)
+_TWITTER_RE = re.compile(r'name=["\']twitter:data1["\'][^>]*content=["\']([^"\']+)["\']', re.I)
+# Case-insensitive prechecks, like the patterns they guard. They test a
+# superset of the markers ("+json", ":price:amount"/":data1") so each starts
+# with a literal char; a leading case-folded "ld"/"product" is ~10x slower.
+_JSONLD_MARKER_RE = re.compile(r"\+json", re.I)
+_OG_MARKER_RE = re.compile(r":(?:price:amount|data1)", re.I)
+_PRICE_REGEX_CACHE: Dict[str, re.Pattern] = {}  # user-supplied price_regex -> compiled
+_JSONLD_PRICE_TYPES = {"Offer", "AggregateOffer", "Product"}
+_SELECTOR_CACHE: Dict[str, CSSSelector] = {}  # CSS selector -> compiled XPath
+_PARSERS = threading.local()  # lxml parser objects must not be shared between threads
 
 # ----------------- Utilities -----------------
+def json_loads(raw: Union[str, bytes]) -> Any:
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
 def load_yaml(path: str) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=YamlLoader)
+
+def load_config(path: str) -> Dict[str, Any]:
+    """YAML config, or the same structure as JSON when the file ends in .json."""
+    if path.lower().endswith(".json"):
+        with open(path, "rb") as f:
+            return json_loads(f.read())
+    return load_yaml(path)
 
 def load_state(path: str) -> Dict[str, Any]:
     if not os.path.exists(path):
         return {}
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        return json_loads(f.read())
 
 def save_state(path: str, data: Dict[str, Any]) -> None:
     tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    if orjson:
+        raw = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        raw = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    with open(tmp, "wb") as f:
+        f.write(raw)
     os.replace(tmp, path)
 
 def extract_price_number(text: str) -> Optional[float]:
     if not text:
         return None
-    cleaned = re.sub(r"[^\d.,]", "", text)
+    cleaned = _NUM_CLEAN_RE.sub("", text)
     if not cleaned:
         return None
     last_dot = cleaned.rfind(".")
@@ -68,7 +131,10 @@ def extract_price_number(text: str) -> Optional[float]:
         main = cleaned.replace(".", "").replace(",", ".")
     else:
         main = cleaned.replace(",", "")
-    m = re.search(r"\d+(?:\.\d+)?", main)
+    # common case ("2499", "1999.00"): float() directly, no second regex pass
+    if main[0].isdigit() and main.count(".") <= 1:
+        return float(main)
+    m = _NUM_EXTRACT_RE.search(main)
     return float(m.group(0)) if m else None
 
 def pct_drop(old: float, new: float) -> float:
@@ -76,62 +142,166 @@ def pct_drop(old: float, new: float) -> float:
         return 0.0
     return ((old - new) / old) * 100.0
 
-def fetch_text(session: requests.Session, url: str, timeout: int = 25, headers: Dict[str, str] = None) -> str:
-    resp = session.get(url, headers=headers or {}, timeout=timeout)
-    resp.raise_for_status()
-    return resp.text
-
-def fetch_doc(session: requests.Session, url: str, timeout: int = 25, headers: Dict[str, str] = None) -> html.HtmlElement:
-    resp = session.get(url, headers=headers or {}, timeout=timeout)
+def conditional_get(session: requests.Session, url: str, timeout: int, headers: Optional[Dict[str, str]],
+                    validators: Optional[Dict[str, str]], stream: bool = False) -> Optional[requests.Response]:
+    """GET url, revalidating against `validators` (etag/last_modified).
+
+    Returns None on 304; otherwise stores the response's validators back
+    into `validators` for the caller to persist.
+    """
+    headers = dict(headers or {})
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+    resp = session.get(url, headers=headers, timeout=timeout, stream=stream)
+    if resp.status_code == 304 and validators:
+        resp.close()
+        return None
+    if not resp.ok:
+        resp.close()
     resp.raise_for_status()
-    return html.fromstring(resp.content)
+    if validators is not None:
+        validators.clear()
+        if resp.headers.get("ETag"):
+            validators["etag"] = resp.headers["ETag"]
+        if resp.headers.get("Last-Modified"):
+            validators["last_modified"] = resp.headers["Last-Modified"]
+    return resp
+
+def html_parser(encoding: Optional[str] = None) -> html.HTMLParser:
+    """This thread's HTML parser; skips the id index, which nothing here uses.
+
+    `encoding` pins the input charset (for re-encoded text); None lets lxml
+    detect it from the document as usual.
+    """
+    key = encoding or "detect"
+    parser = getattr(_PARSERS, key, None)
+    if parser is None:
+        parser = html.HTMLParser(collect_ids=False, encoding=encoding)
+        setattr(_PARSERS, key, parser)
+    return parser
+
+def fetch_text(session: requests.Session, url: str, timeout: int = 25, headers: Dict[str, str] = None,
+               validators: Optional[Dict[str, str]] = None) -> Union[str, object]:
+    resp = conditional_get(session, url, timeout, headers, validators)
+    return NOT_MODIFIED if resp is None else resp.text
+
+def fetch_doc(session: requests.Session, url: str, timeout: int = 25, headers: Dict[str, str] = None,
+              validators: Optional[Dict[str, str]] = None, parser: str = "lxml") -> Any:
+    """Parsed page: an lxml root element, or a LexborHTMLParser for parser="lexbor"."""
+    resp = conditional_get(session, url, timeout, headers, validators, stream=True)
+    if resp is None:
+        return NOT_MODIFIED
+    with resp:
+        if parser == "lexbor":
+            return LexborHTMLParser(resp.content)
+        # Streamed: lxml reads the (transparently decompressed) socket directly
+        # instead of going through a full bytes copy of a large result page.
+        resp.raw.decode_content = True
+        return html.parse(resp.raw, parser=html_parser()).getroot()
+
+def _offer_prices(node: Any, prices: List[float]) -> None:
+    """Collect price/lowPrice/highPrice from Offer-like objects anywhere in a JSON-LD tree."""
+    if isinstance(node, list):
+        for child in node:
+            _offer_prices(child, prices)
+        return
+    if not isinstance(node, dict):
+        return
+    types = node.get("@type")
+    types = types if isinstance(types, list) else [types]
+    # "@type" may be a bare name or a full "https://schema.org/Offer" IRI
+    if any(isinstance(t, str) and t.rsplit("/", 1)[-1] in _JSONLD_PRICE_TYPES for t in types):
+        for k in ("price", "lowPrice", "highPrice"):
+            v = node.get(k)
+            if isinstance(v, (int, float, str)) and not isinstance(v, bool):
+                p = extract_price_number(str(v))
+                if p is not None:
+                    prices.append(p)
+    for child in node.values():
+        if isinstance(child, (dict, list)):
+            _offer_prices(child, prices)
 
 def jsonld_prices(text: str) -> List[float]:
     """Parse all application/ld+json blobs for Offer/lowPrice/price."""
+    # a marker search is far cheaper than the DOTALL script regex
+    if not _JSONLD_MARKER_RE.search(text):
+        return []
     prices = []
-    for m in re.finditer(r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', text, flags=re.S|re.I):
-        blob = m.group(1)
-        # naive extraction of "price" / "lowPrice" values
-        for k in ("price", "lowPrice", "highPrice"):
-            for pm in re.finditer(rf'"{k}"\s*:\s*"?([0-9][0-9\.,]*)"?', blob):
+    for m in _JSONLD_SCRIPT_RE.finditer(text):
+        blob = m.group(1).strip()
+        try:
+            data = json_loads(blob)
+        except ValueError:
+            # malformed blob (trailing commas, comments, ...): naive key scan
+            for pm in _PRICE_KEY_RE.finditer(blob):
                 p = extract_price_number(pm.group(1))
                 if p is not None:
                     prices.append(p)
+            continue
+        _offer_prices(data, prices)
     return prices
 
 def og_price(text: str) -> Optional[float]:
-    m = re.search(r'property=["\']product:price:amount["\'][^>]*content=["\']([^"\']+)["\']', text, flags=re.I)
+    if not _OG_MARKER_RE.search(text):
+        return None
+    m = _OG_RE.search(text)
     if not m:
-        m = re.search(r'name=["\']twitter:data1["\'][^>]*content=["\']([^"\']+)["\']', text, flags=re.I)  # rare
+        m = _TWITTER_RE.search(text)  # rare
     return extract_price_number(m.group(1)) if m else None
 
+def css(selector: str) -> CSSSelector:
+    """CSS selector translated to a compiled XPath once per process.
+
+    `element.cssselect(sel)` re-translates the CSS on every call, which adds
+    up when applied to every card of a long result page.
+    """
+    sel = _SELECTOR_CACHE.get(selector)
+    if sel is None:
+        sel = _SELECTOR_CACHE[selector] = CSSSelector(selector, translator="html")
+    return sel
+
 # ----------------- Retailer price fetch -----------------
-def fetch_product_price(session: requests.Session, prod: Dict[str, Any]) -> Optional[float]:
+def compiled_price_regex(pattern: str) -> re.Pattern:
+    rx = _PRICE_REGEX_CACHE.get(pattern)
+    if rx is None:
+        rx = _PRICE_REGEX_CACHE[pattern] = re.compile(pattern, re.I)
+    return rx
+
+def fetch_product_price(session: requests.Session, prod: Dict[str, Any],
+                        validators: Optional[Dict[str, str]] = None) -> Union[Optional[float], object]:
+    """Current price for a retailer page, or NOT_MODIFIED if the page is unchanged."""
     url = prod["url"]
     headers = {"User-Agent": prod.get("user_agent", "Mozilla/5.0")}
     timeout = int(prod.get("timeout", 25))
 
+    # one GET serves every strategy below
+    text = fetch_text(session, url, timeout=timeout, headers=headers, validators=validators)
+    if text is NOT_MODIFIED:
+        return NOT_MODIFIED
+
     # 1) Variant regex if provided
     if prod.get("price_regex"):
-        text = fetch_text(session, url, timeout=timeout, headers=headers)
-        m = re.search(prod["price_regex"], text, flags=re.I)
+        m = compiled_price_regex(prod["price_regex"]).search(text)
         if m:
             return extract_price_number(m.group(1))
 
     # 2) JSON-LD / OG
-    text = fetch_text(session, url, timeout=timeout, headers=headers)
     jl = jsonld_prices(text)
     if jl:
         # choose the minimum positive price to bias variant/lowPrice
-        return min([p for p in jl if p > 0]) if any(p > 0 for p in jl) else None
+        positive = [p for p in jl if p > 0]
+        return min(positive) if positive else None
     og = og_price(text)
     if og:
         return og
 
     # 3) CSS selector fallback
     if "selector" in prod and prod["selector"]:
-        doc = html.fromstring(text.encode("utf-8"))
-        nodes = doc.cssselect(prod["selector"])
+        doc = html.fromstring(text.encode("utf-8"), parser=html_parser("utf-8"))
+        nodes = css(prod["selector"])(doc)
         if nodes:
             node = nodes[0]
             raw = (node.get(prod.get("attr")) if prod.get("attr") else node.text_content()) or ""
@@ -140,50 +310,86 @@ def fetch_product_price(session: requests.Session, prod: Dict[str, Any]) -> Opti
     return None
 
 # ----------------- Used search scraping -----------------
-def text_ok(s: str, includes: List[str], excludes: List[str]) -> bool:
+def lowered(keywords: List[str]) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(str(k).lower() for k in keywords or ()))
+
+def keyword_filters(scfg: Dict[str, Any]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Lowercased (includes, excludes) for text_ok with redundant keywords pruned.
+
+    An include contained in a longer include ("k" in "kt") is implied by it,
+    and an exclude containing a shorter exclude can never be the deciding
+    match, so neither needs its own substring scan per title. Longest
+    includes go first as they are the likeliest to fail fast.
+    """
+    inc = lowered(scfg.get("include_keywords", []))
+    exc = lowered(scfg.get("exclude_keywords", []))
+    inc = tuple(sorted((k for k in inc if not any(k != o and k in o for o in inc)), key=len, reverse=True))
+    exc = tuple(k for k in exc if not any(k != o and o in k for o in exc))
+    return inc, exc
+
+def text_ok(s: str, includes: Tuple[str, ...], excludes: Tuple[str, ...]) -> bool:
+    """Keyword filter; `includes`/`excludes` must already be lowercase (see lowered())."""
     S = s.lower()
-    if includes and not all(k.lower() in S for k in includes):
+    if includes and not all(k in S for k in includes):
         return False
-    if excludes and any(k.lower() in S for k in excludes):
+    if excludes and any(k in S for k in excludes):
         return False
     return True
 
-def extract_items(doc: html.HtmlElement, cfg: Dict[str, Any]) -> List[Tuple[str,str,Optional[float]]]:
-    """Return list of (title, url, price)."""
+# (select, text, href) accessors for each supported tree type
+_LXML_NODE_OPS = (
+    lambda node, selector: css(selector)(node),
+    lambda node: node.text_content(),
+    lambda node: node.get("href", ""),
+)
+_LEXBOR_NODE_OPS = (
+    lambda node, selector: node.css(selector),
+    lambda node: node.text(deep=True),
+    lambda node: node.attributes.get("href") or "",
+)
+
+def extract_items(doc: Any, cfg: Dict[str, Any]) -> List[Tuple[str,str,Optional[float]]]:
+    """Return list of (title, url, price) from an lxml or Lexbor tree."""
+    is_lexbor = LexborHTMLParser is not None and isinstance(doc, LexborHTMLParser)
+    select, text_of, href_of = _LEXBOR_NODE_OPS if is_lexbor else _LXML_NODE_OPS
+    title_sel = cfg.get("title_selector")
+    url_sel = cfg.get("url_selector")
+    price_sel = cfg.get("price_selector")
+    base = cfg["url"]
+    base_is_http = base.startswith("http")
     items = []
-    for card in doc.cssselect(cfg["item_selector"]):
+    for card in select(doc, cfg["item_selector"]):
         title = ""
         url = ""
         price = None
         # title
         try:
-            if cfg.get("title_selector"):
-                tnode = card.cssselect(cfg["title_selector"])
+            if title_sel:
+                tnode = select(card, title_sel)
                 if tnode:
-                    title = tnode[0].text_content().strip()
+                    title = text_of(tnode[0]).strip()
         except Exception:
             pass
         # url
         try:
-            if cfg.get("url_selector"):
-                unode = card.cssselect(cfg["url_selector"])
+            if url_sel:
+                unode = select(card, url_sel)
                 if unode:
-                    href = unode[0].get("href", "").strip()
+                    href = href_of(unode[0]).strip()
                     # make absolute if needed
                     if href and href.startswith("//"):
                         href = "https:" + href
-                    elif href and href.startswith("/") and cfg["url"].startswith("http"):
-                        from urllib.parse import urljoin
-                        href = urljoin(cfg["url"], href)
+                    elif href and href.startswith("/") and base_is_http:
+                        href = urljoin(base, href)
                     url = href
         except Exception:
             pass
         # price
         try:
-            if cfg.get("price_selector"):
-                pnode = card.cssselect(cfg["price_selector"])
+            if price_sel:
+                pnode = select(card, price_sel)
                 if pnode:
-                    price = extract_price_number(pnode[0].text_content())
+                    price = extract_price_number(text_of(pnode[0]))
         except Exception:
             pass
 
@@ -191,14 +397,21 @@ def extract_items(doc: html.HtmlElement, cfg: Dict[str, Any]) -> List[Tuple[str,
             items.append((title, url, price))
     return items
 
-def search_used_market(session: requests.Session, scfg: Dict[str, Any], seen: set, msrp: Optional[float]) -> List[Dict[str, Any]]:
+def search_used_market(session: requests.Session, scfg: Dict[str, Any], seen: set, msrp: Optional[float],
+                       validators: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
     headers = {"User-Agent": scfg.get("user_agent", "Mozilla/5.0")}
-    doc = fetch_doc(session, scfg["url"], headers=headers, timeout=int(scfg.get("timeout", 25)))
+    parser = scfg.get("parser", "lxml")
+    if parser == "lexbor" and LexborHTMLParser is None:
+        logging.warning("selectolax not installed; parsing %s with lxml.", scfg.get("id") or scfg["url"])
+        parser = "lxml"
+    doc = fetch_doc(session, scfg["url"], headers=headers, timeout=int(scfg.get("timeout", 25)),
+                    validators=validators, parser=parser)
+    if doc is NOT_MODIFIED:
+        return []  # same listings as last run, all already considered
     candidates = extract_items(doc, scfg)
     results = []
 
-    inc = scfg.get("include_keywords", [])
-    exc = scfg.get("exclude_keywords", [])
+    inc, exc = keyword_filters(scfg)
     alert_below = scfg.get("alert_below")
     alert_pct = scfg.get("alert_percent_below_msrp")
 
@@ -225,45 +438,75 @@ def search_used_market(session: requests.Session, scfg: Dict[str, Any], seen: se
     return results
 
 # ----------------- Email -----------------
-def send_email(cfg: Dict[str, Any], subject: str, body: str) -> None:
+def send_email(server: smtplib.SMTP, cfg: Dict[str, Any], subject: str, body: str) -> None:
     smtp = cfg["smtp"]
-    msg = MIMEText(body, "plain", "utf-8")
+    msg = EmailMessage()
+    msg.set_content(body)
     msg["Subject"] = subject
     msg["From"] = smtp["from"]
     msg["To"] = ", ".join(smtp["to"])
+    server.send_message(msg, from_addr=smtp["from"], to_addrs=smtp["to"])
 
+def send_alerts(cfg: Dict[str, Any], alerts: List[Tuple[str, str]]) -> None:
+    """Deliver queued (subject, body) alerts over a single SMTP connection."""
+    if not alerts:
+        return
+    smtp = cfg["smtp"]
     context = ssl.create_default_context()
-    with smtplib.SMTP_SSL(smtp["host"], smtp.get("port", 465), context=context) as server:
-        server.login(smtp["username"], smtp["password"])
-        server.sendmail(smtp["from"], smtp["to"], msg.as_string())
+    try:
+        with smtplib.SMTP_SSL(smtp["host"], smtp.get("port", 465), context=context) as server:
+            server.login(smtp["username"], smtp["password"])
+            for subject, body in alerts:
+                try:
+                    send_email(server, cfg, subject, body)
+                    logging.info("Email sent: %s", subject)
+                except Exception as e:
+                    logging.error("Failed to send email %r: %s", subject, e)
+    except Exception as e:
+        logging.error("Failed to send %d alert email(s): %s", len(alerts), e)
 
 # ----------------- Main -----------------
-def main(config_path: str = "config.yaml") -> None:
-    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
-    cfg = load_yaml(config_path)
-    state = load_state(STATE_FILE)
-    session = requests.Session()
-    if "http" in cfg:
-        session.headers.update(cfg["http"].get("headers", {}))
-
-    smtp_ok = "smtp" in cfg and all(k in cfg["smtp"] for k in ("host", "username", "password", "from", "to"))
-    if not smtp_ok:
-        logging.warning("SMTP not fully configured; alerts will be logged but not emailed.")
-
-    # ----- Retailers -----
-    for prod in cfg.get("products", []):
-        pid = prod.get("id") or prod["url"]
+def config_fingerprint(entry: Dict[str, Any], msrp: Optional[float] = None) -> str:
+    """Hash of the settings a page's result depends on.
+
+    A 304 only says the page is unchanged; if the config reading it changed
+    (thresholds, keywords, selectors, regex, msrp) the page must be refetched.
+    """
+    blob = json.dumps({"entry": entry, "msrp": msrp}, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+def _cached_validators(st: Dict[str, Any], fingerprint: str) -> Dict[str, str]:
+    if st.get("config_hash") != fingerprint:
+        return {}  # config changed since the validators were stored: full fetch
+    return {k: st[k] for k in VALIDATOR_KEYS if k in st}
+
+def _store_validators(st: Dict[str, Any], validators: Dict[str, str], fingerprint: Optional[str] = None) -> None:
+    for k in VALIDATOR_KEYS + ("config_hash",):
+        st.pop(k, None)
+    if validators and fingerprint:
+        st.update(validators, config_hash=fingerprint)
+
+def _handle_products(cfg: Dict[str, Any], state: Dict[str, Any],
+                     futures: Dict[Any, Tuple[Dict[str, Any], Dict[str, str], str]], alerts: List[Tuple[str, str]]) -> None:
+    for fut in as_completed(futures):
+        prod, validators, fingerprint = futures[fut]
+        pid = str(prod.get("id") or prod["url"])
         st = state.setdefault("products", {}).setdefault(pid, {})
         baseline = st.get("baseline")
 
         try:
-            price = fetch_product_price(session, prod)
+            price = fut.result()
         except Exception as e:
             logging.error("Failed to fetch %s: %s", pid, e)
             continue
 
+        if price is NOT_MODIFIED:
+            logging.info("Unchanged since last check: %s", pid)
+            price = st.get("last_price")
         if price is None:
             logging.error("Could not parse price for %s.", pid)
+            # force a full fetch next run rather than trusting a 304
+            _store_validators(st, {})
             continue
 
         now = int(time.time())
@@ -289,6 +532,7 @@ def main(config_path: str = "config.yaml") -> None:
             "url": prod["url"],
             "name": prod.get("name", pid),
         })
+        _store_validators(st, validators, fingerprint)
 
         if drop_now >= drop_needed:
             subject = f"[Retail Price Drop] {prod.get('name', pid)} → {price:.2f} ({drop_now:.1f}% down)"
@@ -296,22 +540,17 @@ def main(config_path: str = "config.yaml") -> None:
                 f"{prod.get('name', pid)}\n{prod['url']}\n\n"
                 f"Current: ${price:,.2f}\nBaseline: ${baseline:,.2f}\nDrop: {drop_now:.2f}% (threshold {drop_needed:.2f}%)\n"
             )
-            if smtp_ok:
-                try:
-                    send_email(cfg, subject, body)
-                    logging.info("Email sent for %s", pid)
-                except Exception as e:
-                    logging.error("Failed to send email: %s", e)
+            alerts.append((subject, body))
 
-    # ----- Used Searches -----
-    msrp = float(cfg.get("msrp", 0) or 0)
-    for scfg in cfg.get("searches", []):
-        sid = scfg.get("id") or scfg["url"]
-        sstate = state.setdefault("searches", {}).setdefault(sid, {})
-        seen = set(sstate.get("seen", []))
+def _handle_searches(state: Dict[str, Any],
+                     futures: Dict[Any, Tuple[Dict[str, Any], Dict[str, str], str]], alerts: List[Tuple[str, str]]) -> None:
+    for fut in as_completed(futures):
+        scfg, validators, fingerprint = futures[fut]
+        sid = str(scfg.get("id") or scfg["url"])
+        sstate = state["searches"][sid]
 
         try:
-            matches = search_used_market(session, scfg, seen, msrp if msrp > 0 else None)
+            matches = fut.result()
         except Exception as e:
             logging.error("Failed used-search %s: %s", sid, e)
             continue
@@ -321,23 +560,100 @@ def main(config_path: str = "config.yaml") -> None:
             for m in matches:
                 price_part = f" — ${m['price']:,.0f}" if m.get("price") is not None else ""
                 lines.append(f"- {m['title']}{price_part}\n  {m['url']}\n  Trigger: {m['reason']}")
-                if m.get("url"):
-                    seen.add(m["url"])
             subject = f"[Used Finds] {scfg.get('name', sid)} — {len(matches)} new match(es)"
             body = f"{scfg.get('name', sid)}\n{scfg['url']}\n\n" + "\n\n".join(lines)
-            if smtp_ok:
-                try:
-                    send_email(cfg, subject, body)
-                except Exception as e:
-                    logging.error("Failed to send used-search email: %s", e)
-        # persist seen set
-        sstate["seen"] = sorted(list(seen))[-2000:]
+            alerts.append((subject, body))
+        # persist seen URLs oldest-first so trimming drops the oldest ones
+        new_urls = [m["url"] for m in matches if m.get("url")]
+        if new_urls:
+            sstate["seen"] = list(dict.fromkeys(sstate.get("seen", []) + new_urls))[-SEEN_LIMIT:]
+        _store_validators(sstate, validators, fingerprint)
+
+def make_session(cfg: Dict[str, Any]) -> requests.Session:
+    """Shared session: pooled + retrying, optionally backed by an on-disk HTTP cache."""
+    http_cfg = cfg.get("http", {})
+    cache_cfg = http_cfg.get("cache")
+    if cache_cfg and requests_cache is None:
+        logging.warning("http.cache is set but requests-cache is not installed; caching disabled.")
+    if cache_cfg and requests_cache is not None:
+        cache_cfg = cache_cfg if isinstance(cache_cfg, dict) else {}
+        # pages marked http_cache: false (e.g. dynamic price_regex targets) always hit the network
+        # exact-match regexes (plain string keys are glob *prefix* patterns),
+        # built from the prepared URL requests-cache actually sees: requests
+        # adds the trailing "/" to bare hosts and percent-encodes non-ASCII
+        no_cache = {
+            re.compile("^" + re.escape(requests.Request("GET", entry["url"]).prepare().url) + "$"): requests_cache.DO_NOT_CACHE
+            for entry in cfg.get("products", []) + cfg.get("searches", [])
+            if entry.get("http_cache") is False
+        }
+        session = requests_cache.CachedSession(
+            cache_name=cache_cfg.get("path", ".pt_http_cache"),
+            backend="sqlite",
+            expire_after=int(cache_cfg.get("expire_after", 1800)),
+            urls_expire_after=no_cache or None,
+            cache_control=True,
+            stale_if_error=True,
+        )
+    else:
+        session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["GET"])
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # only advertises br/zstd when urllib3 can actually decode them
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    session.headers.update(http_cfg.get("headers", {}))
+    return session
+
+def main(config_path: str = "config.yaml") -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
+    cfg = load_config(config_path)
+    state = load_state(STATE_FILE)
+    session = make_session(cfg)
+
+    smtp_ok = "smtp" in cfg and all(k in cfg["smtp"] for k in ("host", "username", "password", "from", "to"))
+    if not smtp_ok:
+        logging.warning("SMTP not fully configured; alerts will be logged but not emailed.")
+
+    # Fetches overlap in a thread pool; all state bookkeeping stays on this
+    # thread as results complete, so `state` needs no locking.
+    msrp = float(cfg.get("msrp", 0) or 0)
+    workers = int(cfg.get("http", {}).get("max_workers", MAX_WORKERS))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        # workers fill private copies of the cache validators; they are
+        # merged back into state only once a result has been handled
+        product_futures = {}
+        for prod in cfg.get("products", []):
+            pid = str(prod.get("id") or prod["url"])
+            st = state.setdefault("products", {}).setdefault(pid, {})
+            fingerprint = config_fingerprint(prod)
+            validators = _cached_validators(st, fingerprint)
+            product_futures[pool.submit(fetch_product_price, session, prod, validators)] = (prod, validators, fingerprint)
+        search_futures = {}
+        for scfg in cfg.get("searches", []):
+            sid = str(scfg.get("id") or scfg["url"])
+            sstate = state.setdefault("searches", {}).setdefault(sid, {})
+            seen = set(sstate.get("seen", []))
+            fingerprint = config_fingerprint(scfg, msrp)
+            validators = _cached_validators(sstate, fingerprint)
+            fut = pool.submit(search_used_market, session, scfg, seen, msrp if msrp > 0 else None, validators)
+            search_futures[fut] = (scfg, validators, fingerprint)
+
+        alerts: List[Tuple[str, str]] = []
+        _handle_products(cfg, state, product_futures, alerts)
+        _handle_searches(state, search_futures, alerts)
+
+    if smtp_ok:
+        send_alerts(cfg, alerts)
+    else:
+        for subject, _ in alerts:
+            logging.info("Alert (not emailed): %s", subject)
 
     save_state(STATE_FILE, state)
 
 if __name__ == "__main__":
     import argparse
     ap = argparse.ArgumentParser(description="Track retailer prices and search used listings; email on triggers.")
-    ap.add_argument("-c", "--config", default="config.yaml", help="Path to YAML config.")
+    ap.add_argument("-c", "--config", default="config.yaml", help="Path to YAML (or .json) config.")
     args = ap.parse_args()
     main(args.config)